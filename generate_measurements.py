@@ -1,7 +1,14 @@
 #!/usr/bin/env python3
-import argparse, csv, random, sys
+import argparse, csv, hashlib, heapq, json, math, os, pickle, random, shutil, sys, tempfile
+from contextlib import ExitStack
 from datetime import datetime, timedelta
+from itertools import accumulate
+from operator import itemgetter
 from pathlib import Path
+from statistics import NormalDist
+
+from measurement_index import BLOCK_FIELDS, ByteCountingWriter, IndexWriter, index_path_for, rebase_index
+from sqlite_sink import SqliteSink
 
 # ---- Config: sport-specific metric specs ----
 # Center/SD are for adult male baseline; min/max expanded to accommodate all ages/genders
@@ -170,7 +177,7 @@ def get_position_adjustment(sport, position, metric):
 def parse_args():
     p = argparse.ArgumentParser(description="Generate sport-specific testing measurements from a roster.")
     p.add_argument("--roster", required=True, help="Path to roster CSV")
-    p.add_argument("--out", required=True, help="Output measurements CSV")
+    p.add_argument("--out", help="Output measurements CSV (raw trials)")
     p.add_argument("--trials", type=int, default=3, help="Trials per metric per date (default 3)")
     p.add_argument("--dates", nargs="*", help="Test dates YYYY-MM-DD. If omitted, generates random dates.")
     p.add_argument("--num_random_dates", type=int, default=1, help="If no --dates, how many random dates to make")
@@ -179,7 +186,36 @@ def parse_args():
     p.add_argument("--performance_level", choices=["elite", "varsity", "jv", "recreational"], help="Predefined performance level")
     p.add_argument("--performance_multiplier", type=float, help="Custom performance multiplier (overrides --performance_level)")
     p.add_argument("--seed", type=int, default=42, help="Random seed for reproducibility")
-    return p.parse_args()
+    p.add_argument("--chunk_size", type=int, default=0, help="Athletes per checkpointed chunk (default 0 = single pass)")
+    p.add_argument("--chunk_dir", help="Directory for chunk files and manifest (default: <out>.chunks)")
+    p.add_argument("--resume", action="store_true", help="Skip chunks already completed by an interrupted run")
+    p.add_argument("--sqlite", help="Also bulk-load roster and measurements into this SQLite database")
+    p.add_argument("--summary_out", help="Per athlete x date x metric summary CSV (best, mean, SD of trials)")
+    p.add_argument("--index", action="store_true", help="Write a byte-offset index sidecar (<out>.idx) for fast lookups")
+    p.add_argument("--order", choices=["athlete", "date"], default="athlete",
+                   help="Row order: all dates per athlete (default) or all athletes per date")
+    p.add_argument("--memory_mb", type=int, default=256,
+                   help="Buffer budget for --order date before spilling sorted runs to disk (default 256)")
+    p.add_argument("--ar1_phi", type=float,
+                   help="Add AR(1) session-to-session noise with this autocorrelation (0 <= phi < 1)")
+    args = p.parse_args()
+    if args.ar1_phi is not None and not 0.0 <= args.ar1_phi < 1.0:
+        p.error("--ar1_phi must be in [0, 1)")
+    if args.memory_mb <= 0:
+        p.error("--memory_mb must be > 0")
+    if args.index and not args.out:
+        p.error("--index requires --out")
+    if not args.out and not args.sqlite and not args.summary_out:
+        p.error("at least one of --out, --summary_out or --sqlite is required")
+    if args.chunk_size and not (args.out or args.summary_out):
+        p.error("--chunk_size requires --out or --summary_out")
+    if args.chunk_size and args.sqlite:
+        p.error("--sqlite cannot be combined with --chunk_size")
+    if args.chunk_size < 0:
+        p.error("--chunk_size must be >= 0")
+    if args.resume and not args.chunk_size:
+        p.error("--resume requires --chunk_size")
+    return args
 
 def read_roster(path):
     with open(path, newline="", encoding="utf-8") as f:
@@ -202,18 +238,91 @@ def rand_dates(n, start_str, end_str):
         ds.add(start + timedelta(days=random.randint(0, span)))
     return sorted(ds)
 
-def age_on(birth_date_str, on_date):
-    # birth_date as YYYY-MM-DD
+def ages_on(birth_date_str, dates):
+    """Age in whole years on each date, parsing the birth date (YYYY-MM-DD) only once."""
     try:
         bd = datetime.strptime(birth_date_str, "%Y-%m-%d").date()
     except Exception:
-        return ""  # missing or malformed
-    years = on_date.year - bd.year - ((on_date.month, on_date.day) < (bd.month, bd.day))
-    return years
+        return [""] * len(dates)  # missing or malformed
+    return [d.year - bd.year - ((d.month, d.day) < (bd.month, bd.day)) for d in dates]
 
 def clamp(x, lo, hi):
     return max(lo, min(hi, x))
 
+# ---- Truncated-normal sampling ----
+# Values are drawn by inverse-CDF sampling restricted to [min, max], so they never pile
+# up at the bounds the way gauss-then-clamp does. The standard normal quantile function
+# is tabulated once and linearly interpolated; the steep tails use the exact quantile.
+INV_CDF_TABLE_SIZE = 8192
+INV_CDF_TAIL = 1.0 / 512  # below this probability (or above 1 - this) use the exact quantile
+_STANDARD_NORMAL = NormalDist()
+_inv_cdf_table = None
+
+def standard_normal_cdf(z):
+    # erfc keeps full relative precision far into the lower tail
+    return 0.5 * math.erfc(-z / math.sqrt(2.0))
+
+def _standard_normal_inv_cdf_table():
+    global _inv_cdf_table
+    if _inv_cdf_table is None:
+        n = INV_CDF_TABLE_SIZE
+        _inv_cdf_table = [_STANDARD_NORMAL.inv_cdf(i / n) if 0 < i < n else 0.0 for i in range(n + 1)]
+    return _inv_cdf_table
+
+def truncated_gauss(mu, sigma, lo, hi, n=1, quantiles=None):
+    """Draw n values from a normal(mu, sigma) distribution truncated to [lo, hi].
+
+    The truncation bounds are converted to a probability window once per call, so
+    batched draws (e.g. all trials of one session) cost one uniform and one table
+    lookup each. If quantiles (uniforms in [0, 1]) are given, they are mapped through
+    the window instead of fresh random draws, one value each, so the same quantile
+    keeps its rank across different windows.
+    """
+    if quantiles is not None:
+        n = len(quantiles)
+    if sigma <= 0:
+        return [clamp(mu, lo, hi)] * n
+    alpha = (lo - mu) / sigma
+    beta = (hi - mu) / sigma
+    scale = sigma
+    if alpha > 0:
+        # Window lies entirely above the mean: sample the mirrored lower tail, where
+        # the CDF is representable with full precision
+        alpha, beta, scale = -beta, -alpha, -sigma
+        if quantiles is not None:
+            quantiles = [1.0 - q for q in quantiles]
+    p_lo = standard_normal_cdf(alpha)
+    width = standard_normal_cdf(beta) - p_lo
+    if width <= 0.0:
+        # Window is so far into the tail that all mass sits at the nearer bound
+        return [hi if scale > 0 else lo] * n
+
+    # Hot loop: table lookup inlined, exact quantile only in the tails
+    table = _standard_normal_inv_cdf_table()
+    size = INV_CDF_TABLE_SIZE
+    tail_lo = INV_CDF_TAIL
+    tail_hi = 1.0 - INV_CDF_TAIL
+    rand = random.random if quantiles is None else iter(quantiles).__next__
+    values = []
+    for _ in range(n):
+        u = p_lo + width * rand()
+        if tail_lo <= u <= tail_hi:
+            pos = u * size
+            i = int(pos)
+            z = table[i] + (table[i + 1] - table[i]) * (pos - i)
+        elif 0.0 < u < 1.0:
+            z = _STANDARD_NORMAL.inv_cdf(u)
+        else:
+            z = alpha if u <= 0.0 else beta
+        x = mu + scale * z
+        # Only floating-point rounding can push x past the edges
+        if x < lo:
+            x = lo
+        elif x > hi:
+            x = hi
+        values.append(x)
+    return values
+
 def get_age_bracket(age):
     """Map age to performance bracket with validation."""
     if age is None or age == "":
@@ -286,11 +395,18 @@ WINGSPAN_HEIGHT_RATIO = {"mean": 1.02, "sd": 0.02}  # Wingspan is typically ~102
 # Standing reach is typically ~130% of height (arm raised overhead)
 STANDING_REACH_HEIGHT_RATIO = {"mean": 1.30, "sd": 0.02}
 
+# Static metrics derived from HEIGHT_IN through a per-athlete ratio
+HEIGHT_RATIOS = {"WINGSPAN": WINGSPAN_HEIGHT_RATIO, "STANDING_REACH": STANDING_REACH_HEIGHT_RATIO}
+
 def compute_static_values(roster_rows, performance_multiplier=1.0):
-    """Compute static metric values (HEIGHT, WEIGHT, etc.) once per athlete for consistency across dates.
+    """Draw each athlete's static metric profile (HEIGHT, WEIGHT, etc.) once.
+
+    Returns {metric: (center, quantile)} per athlete: the center of the athlete's adult
+    distribution and a uniform quantile fixing their place in it. static_values_at() turns
+    the profile into values at a given age, so an athlete keeps the same rank as they grow.
 
-    HEIGHT, WINGSPAN, and STANDING_REACH are correlated: WINGSPAN and STANDING_REACH
-    are derived from HEIGHT using anthropometric ratios with small individual variation.
+    HEIGHT, WINGSPAN, and STANDING_REACH are correlated: for WINGSPAN and STANDING_REACH
+    the center and quantile are those of the athlete's ratio to HEIGHT.
     """
     static_values = {}
     for a in roster_rows:
@@ -315,30 +431,12 @@ def compute_static_values(roster_rows, performance_multiplier=1.0):
             pos_adj = get_position_adjustment(sport, position, "HEIGHT_IN")
             center = center + pos_adj["additive"]
 
-            # Add small per-athlete variation
-            athlete_variation = random.gauss(0.0, spec["sd"] * 0.3)
-            height_value = clamp(center + athlete_variation, spec["min"], spec["max"])
-            athlete_static["HEIGHT_IN"] = height_value
-        else:
-            height_value = None
-
-        # Compute WINGSPAN derived from HEIGHT with individual ratio variation
-        if "WINGSPAN" in metrics and height_value is not None:
-            spec = metrics["WINGSPAN"]
-            # Each athlete gets their own ape index (wingspan/height ratio)
-            athlete_ratio = random.gauss(WINGSPAN_HEIGHT_RATIO["mean"], WINGSPAN_HEIGHT_RATIO["sd"])
-            wingspan_value = height_value * athlete_ratio
-            wingspan_value = clamp(wingspan_value, spec["min"], spec["max"])
-            athlete_static["WINGSPAN"] = wingspan_value
-
-        # Compute STANDING_REACH derived from HEIGHT with individual ratio variation
-        if "STANDING_REACH" in metrics and height_value is not None:
-            spec = metrics["STANDING_REACH"]
-            # Each athlete gets their own standing reach ratio
-            athlete_ratio = random.gauss(STANDING_REACH_HEIGHT_RATIO["mean"], STANDING_REACH_HEIGHT_RATIO["sd"])
-            reach_value = height_value * athlete_ratio
-            reach_value = clamp(reach_value, spec["min"], spec["max"])
-            athlete_static["STANDING_REACH"] = reach_value
+            athlete_static["HEIGHT_IN"] = (center, random.random())
+
+            # Each athlete gets their own ape index (wingspan/height) and reach ratio
+            for metric, ratio in HEIGHT_RATIOS.items():
+                if metric in metrics:
+                    athlete_static[metric] = (ratio["mean"], random.random())
 
         # Compute other static metrics (WEIGHT_LBS, etc.) independently
         for metric, spec in metrics.items():
@@ -359,44 +457,579 @@ def compute_static_values(roster_rows, performance_multiplier=1.0):
             center = center + pos_adj["additive"]
             center = center * pos_adj["multiplicative"]
 
-            # Add small per-athlete variation
-            athlete_variation = random.gauss(0.0, spec["sd"] * 0.3)
-            value = clamp(center + athlete_variation, spec["min"], spec["max"])
-            athlete_static[metric] = value
+            athlete_static[metric] = (center, random.random())
 
         static_values[key] = athlete_static
 
     return static_values
 
-def gen_value(spec, base_offset, day_index, jitter_sd, age=None, gender=None, metric=None,
-              performance_multiplier=1.0, sport=None, position=None):
-    center = spec["center"]
-    is_static = spec.get("static", False)
+def static_values_at(athlete_static, metrics, age, gender):
+    """Return {metric: value} for an athlete's static metrics at one age.
 
+    The adult distribution (center, small per-athlete SD) and the metric's min are scaled
+    by the growth factor at that age, so young athletes get their own floor, and the
+    athlete's quantile is mapped through that truncated distribution. WINGSPAN and
+    STANDING_REACH are the height at that age times the athlete's ratio, truncated the
+    same way.
+    """
+    values = {}
+    for metric, (center, quantile) in athlete_static.items():
+        if metric in HEIGHT_RATIOS:
+            continue
+        spec = metrics[metric]
+        growth = get_anthropometric_growth_factor(age, gender, metric)
+        values[metric] = truncated_gauss(center * growth, spec["sd"] * 0.3 * growth,
+                                         spec["min"] * growth, spec["max"], quantiles=[quantile])[0]
+
+    height = values.get("HEIGHT_IN")
+    for metric, ratio in HEIGHT_RATIOS.items():
+        if metric in athlete_static and height is not None:
+            spec = metrics[metric]
+            center, quantile = athlete_static[metric]
+            growth = get_anthropometric_growth_factor(age, gender, metric)
+            athlete_ratio = truncated_gauss(center, ratio["sd"], spec["min"] * growth / height,
+                                            spec["max"] / height, quantiles=[quantile])[0]
+            values[metric] = height * athlete_ratio
+    return values
+
+def session_center(spec, age, gender, metric, performance_multiplier=1.0):
+    """Center of a performance (non-static) metric for one session after age, gender and
+    performance adjustments."""
+    center = spec["center"]
     if age is not None and age != "" and gender and metric:
-        if is_static:
-            # Use anthropometric growth curves for static metrics (HEIGHT, WEIGHT, etc.)
-            # Apply gender adjustment first
-            gender_mult = GENDER_ADJUSTMENTS.get(metric, {}).get(gender, 1.0)
-            center = center * gender_mult
+        center = center * get_adjustment_factor(age, gender, metric, spec, performance_multiplier)
+    return center
 
-            # Apply age-based growth factor
-            growth_factor = get_anthropometric_growth_factor(age, gender, metric)
-            center = center * growth_factor
+# ---- Longitudinal time-series engine ----
+# SD of the optional AR(1) session-to-session noise, as a fraction of the metric SD
+SESSION_NOISE_SD_FRAC = 0.25
+# Total training improvement an athlete can reach, in metric SDs; drift levels off towards it
+TREND_PLATEAU_SD = 1.5
 
-            # Apply position adjustments
-            pos_adj = get_position_adjustment(sport, position, metric)
-            center = center + pos_adj["additive"]
-            center = center * pos_adj["multiplicative"]
+def day_offsets(dates):
+    """Days elapsed since the first of the (sorted) dates, as a cumulative sum of the gaps."""
+    gaps = [0] + [(later - earlier).days for earlier, later in zip(dates, dates[1:])]
+    return list(accumulate(gaps))
+
+def drift_trend(spec, offsets):
+    """Training trend at each day offset: starts at drift_per_day and levels off.
+
+    The trend approaches a plateau of TREND_PLATEAU_SD metric SDs exponentially, with
+    the time constant chosen so the initial slope is the metric's drift_per_day.
+    """
+    drift = spec["drift_per_day"]
+    if drift == 0:
+        return [0.0] * len(offsets)
+    plateau = TREND_PLATEAU_SD * spec["sd"]
+    tau = plateau / abs(drift)
+    return [math.copysign(plateau, drift) * -math.expm1(-t / tau) for t in offsets]
+
+def ar1_noise(n, sd, phi):
+    """Stationary AR(1) series e[k] = phi * e[k-1] + innovation, with marginal SD sd."""
+    innovation_sd = sd * math.sqrt(1.0 - phi * phi)
+    first = random.gauss(0.0, sd)
+    innovations = [random.gauss(0.0, innovation_sd) for _ in range(n - 1)]
+    return list(accumulate(innovations, lambda prev, eps: phi * prev + eps, initial=first))
+
+def athlete_trajectory(metric, spec, ages, offsets, base_offset, trials, gender,
+                       performance_multiplier=1.0, ar1_phi=None):
+    """Compute one athlete's values for a performance metric across every session at once.
+
+    ages and offsets give the athlete's age and days elapsed at each session. The age
+    bracket is re-evaluated only when the athlete crosses a birthday. Returns one list of
+    trial values per session.
+    """
+    if not ages:
+        return []
+    centers = {}
+    for age in ages:
+        if age not in centers:
+            centers[age] = session_center(spec, age, gender, metric, performance_multiplier)
+
+    trend = drift_trend(spec, offsets)
+    means = [centers[age] + base_offset + tr for age, tr in zip(ages, trend)]
+    if ar1_phi is not None:
+        noise = ar1_noise(len(means), spec["sd"] * SESSION_NOISE_SD_FRAC, ar1_phi)
+        means = [m + e for m, e in zip(means, noise)]
+
+    jitter_sd = spec["sd"] * 0.5
+    return [truncated_gauss(m, jitter_sd, spec["min"], spec["max"], trials) for m in means]
+
+OUT_FIELDS = ["firstName","lastName","gender","teamName","date","age","metric","trial","value","units","flyInDistance","notes"]
+SUMMARY_FIELDS = ["firstName","lastName","gender","teamName","date","age","metric","trials","best","mean","sd","units","flyInDistance"]
+
+def athlete_key(a):
+    return (a.get("firstName","").strip(), a.get("lastName","").strip(), a.get("teamName","").strip())
+
+def athlete_sessions(a, dates, offsets, per_metric_offset, athlete_static, trials, performance_multiplier,
+                     ar1_phi=None):
+    """Yield (date, age, metric, spec, values) for every date x metric of one athlete.
+
+    dates must be sorted, with offsets the days elapsed at each one. Each metric's whole
+    trajectory is computed up front; sessions are then yielded with static (anthropometric)
+    metrics first within each date, matching the row order of the output CSV.
+    """
+    gender = a.get("gender","")
+    birthDate = a.get("birthDate","")
+    sport = a.get("sports", "").strip()
+
+    metrics = get_sport_metrics(sport)
+    # Sort metrics so static (anthropometric) come first
+    sorted_metrics = sorted(metrics.items(), key=lambda x: (not x[1].get("static", False), x[0]))
+
+    ages = ages_on(birthDate, dates)
+    # Static metrics only change when the athlete crosses a birthday
+    static_by_age = {}
+    for age in ages:
+        if age not in static_by_age:
+            static_by_age[age] = static_values_at(athlete_static, metrics, age, gender)
+
+    trajectories = {}
+    for metric, spec in sorted_metrics:
+        if spec.get("static", False):
+            trajectories[metric] = [[static_by_age[age][metric]] for age in ages]
         else:
-            # Use performance-based adjustments for non-static metrics
-            adjustment = get_adjustment_factor(age, gender, metric, spec, performance_multiplier)
-            center = center * adjustment
+            trajectories[metric] = athlete_trajectory(metric, spec, ages, offsets, per_metric_offset[metric],
+                                                      trials, gender, performance_multiplier, ar1_phi)
+
+    for k, d in enumerate(dates):
+        for metric, spec in sorted_metrics:
+            yield d, ages[k], metric, spec, trajectories[metric][k]
+
+def summarize_trials(values, better):
+    """Return (best, mean, sd) for one athlete x date x metric session.
+
+    Best follows the metric's "better" direction; for "neutral" metrics it is the mean.
+    SD is the sample standard deviation, blank when there is only one trial.
+    """
+    n = len(values)
+    mean = sum(values) / n
+    if better == "lower":
+        best = min(values)
+    elif better == "higher":
+        best = max(values)
+    else:
+        best = mean
+    sd = (sum((v - mean) ** 2 for v in values) / (n - 1)) ** 0.5 if n > 1 else ""
+    return best, mean, sd
+
+def generate_sessions(athletes, dates, base, static_vals, trials, performance_multiplier, ar1_phi=None):
+    """Yield (athlete_pos, date, age, metric, values) sessions in athlete-major order.
+
+    athlete_pos indexes into athletes; values are the trial values rounded for output.
+    """
+    dates = sorted(dates)
+    offsets = day_offsets(dates)
+    for pos, a in enumerate(athletes):
+        key = athlete_key(a)
+        if not a.get("sports", "").strip():
+            print(f"Warning: No sport specified for {key[0]} {key[1]}. Skipping.", file=sys.stderr)
+            continue
+        for d, age, metric, spec, values in athlete_sessions(a, dates, offsets, base[key], static_vals[key],
+                                                             trials, performance_multiplier, ar1_phi):
+            yield pos, d, age, metric, [round(val, 3) for val in values]
+
+# ---- Date-major ordering ----
+# Rough in-memory footprint of one buffered session (tuple, date, list of trial floats)
+SESSION_BYTES_ESTIMATE = 320
+SPILL_BATCH = 10_000
+# Most sorted runs opened at once by a k-way merge; more are merged in groups first
+MAX_MERGE_FANIN = 200
+
+def _write_run(path, sessions):
+    with open(path, "wb") as f:
+        for i in range(0, len(sessions), SPILL_BATCH):
+            pickle.dump(sessions[i:i + SPILL_BATCH], f, protocol=pickle.HIGHEST_PROTOCOL)
+
+def _read_run(path):
+    with open(path, "rb") as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            yield from batch
+
+def _merge_runs(paths, out_path):
+    with open(out_path, "wb") as f:
+        batch = []
+        for session in heapq.merge(*[_read_run(path) for path in paths], key=itemgetter(1)):
+            batch.append(session)
+            if len(batch) >= SPILL_BATCH:
+                pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+                batch = []
+        if batch:
+            pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+def reduce_merge_fanin(paths, merge_files, work_dir, name, suffix):
+    """Merge groups of consecutive sorted runs until at most MAX_MERGE_FANIN remain open at once.
+
+    merge_files(group, out_path) k-way merges one group into out_path.
+    """
+    level = 0
+    while len(paths) > MAX_MERGE_FANIN:
+        merged = []
+        for i in range(0, len(paths), MAX_MERGE_FANIN):
+            out = Path(work_dir) / f"merge_{name}_{level}_{i // MAX_MERGE_FANIN:05d}{suffix}"
+            merge_files(paths[i:i + MAX_MERGE_FANIN], out)
+            merged.append(out)
+        paths = merged
+        level += 1
+    return paths
+
+def order_by_date(sessions, memory_mb):
+    """Reorder athlete-major sessions into date-major order within a memory budget.
+
+    Sessions are buffered and stably sorted by date, so athletes keep their roster order
+    within each date. When the buffer exceeds memory_mb it is spilled to a sorted run on
+    disk, and the runs are combined with a k-way merge (stable across runs, which are
+    produced in roster order).
+    """
+    max_buffered = max(1, memory_mb * 1024 * 1024 // SESSION_BYTES_ESTIMATE)
+    by_date = itemgetter(1)
+    buffer = []
+    with tempfile.TemporaryDirectory(prefix="measurements-runs-") as run_dir:
+        runs = []
+        for session in sessions:
+            buffer.append(session)
+            if len(buffer) >= max_buffered:
+                buffer.sort(key=by_date)
+                path = os.path.join(run_dir, f"run_{len(runs):05d}.pkl")
+                _write_run(path, buffer)
+                runs.append(path)
+                buffer = []
+        buffer.sort(key=by_date)
+        if not runs:
+            yield from buffer
+            return
+        runs = reduce_merge_fanin(runs, _merge_runs, run_dir, "runs", ".pkl")
+        yield from heapq.merge(*[_read_run(path) for path in runs], buffer, key=by_date)
+
+def write_sessions(sessions, athletes, w=None, sw=None, db=None, athlete_ids=None, index=None):
+    """Write generated sessions for the given roster rows to the requested outputs.
+
+    w receives raw trial rows, sw one summary row per athlete x date x metric, and db
+    (with athlete_ids giving the SQLite ID of each roster row) the raw trials. index,
+    if given, records the byte range of each session written through w.
+    Returns the number of trial rows written.
+    """
+    written = 0
+    info = {}
+    for pos, d, age, metric, values in sessions:
+        if pos not in info:
+            a = athletes[pos]
+            info[pos] = (athlete_key(a), a.get("gender",""), a.get("teamName",""),
+                         get_sport_metrics(a.get("sports", "").strip()))
+        key, gender, team, metrics = info[pos]
+        spec = metrics[metric]
+        date_str = d.isoformat()
+
+        if index is not None:
+            start = index.mark()
+        for trial, val in enumerate(values):
+            if w is not None:
+                row = {
+                    "firstName": key[0],
+                    "lastName": key[1],
+                    "gender": gender,
+                    "teamName": team,
+                    "date": date_str,
+                    "age": age,
+                    "metric": metric,
+                    "trial": trial + 1,
+                    "value": val,
+                    "units": spec["units"],
+                    "flyInDistance": spec["flyInDistance"],
+                    "notes": "Auto-generated",
+                }
+                w.writerow(row)
+            if db is not None:
+                db.add_measurement(athlete_ids[pos], date_str, age, metric, trial + 1, val,
+                                   spec["units"], spec["flyInDistance"], "Auto-generated")
+            written += 1
+        if index is not None:
+            index.add(key[0], key[1], team, date_str, metric, start)
+
+        if sw is not None and values:
+            # Summarize the rounded trials (sessions with no trials, e.g. --trials 0, have no summary) so "best" always matches a raw row
+            best, mean, sd = summarize_trials(values, spec["better"])
+            sw.writerow({
+                "firstName": key[0],
+                "lastName": key[1],
+                "gender": gender,
+                "teamName": team,
+                "date": date_str,
+                "age": age,
+                "metric": metric,
+                "trials": len(values),
+                "best": round(best, 3),
+                "mean": round(mean, 3),
+                "sd": round(sd, 3) if sd != "" else "",
+                "units": spec["units"],
+                "flyInDistance": spec["flyInDistance"],
+            })
+    return written
+
+def write_measurements(athletes, dates, base, static_vals, trials, performance_multiplier,
+                       order="athlete", memory_mb=256, ar1_phi=None, **outputs):
+    """Generate and write measurements for the given roster rows (see write_sessions for outputs)."""
+    sessions = generate_sessions(athletes, dates, base, static_vals, trials, performance_multiplier, ar1_phi)
+    if order == "date":
+        sessions = order_by_date(sessions, memory_mb)
+    return write_sessions(sessions, athletes, **outputs)
+
+def open_raw_writer(stack, path, index_path=None, header=True):
+    """Open the raw trial CSV, plus its byte-offset index sidecar when index_path is given.
+
+    Returns (csv writer, IndexWriter or None); files are closed by the ExitStack.
+    """
+    if index_path is None:
+        f = stack.enter_context(open(path, "w", newline="", encoding="utf-8"))
+        w = csv.DictWriter(f, fieldnames=OUT_FIELDS)
+        index = None
+    else:
+        stream = ByteCountingWriter(stack.enter_context(open(path, "wb")))
+        w = csv.DictWriter(stream, fieldnames=OUT_FIELDS)
+        index = IndexWriter(stack.enter_context(open(index_path, "wb")), stream)
+        # Registered after the file so the last block is flushed before it closes
+        stack.callback(index.finish)
+        if header:
+            index.writeheader()
+    if header:
+        w.writeheader()
+    return w, index
+
+# ---- Checkpointed (chunked) generation ----
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+def chunk_seed(seed, index):
+    """Derive a stable RNG seed for a chunk from the run seed and chunk number."""
+    return random.Random(f"{seed}:chunk:{index}").getrandbits(64)
+
+def chunk_filename(index, part):
+    return f"chunk_{index:05d}.{part}.csv"
+
+# Files a chunked run creates in its chunk directory, including their .tmp siblings
+CHUNK_DIR_PATTERNS = [MANIFEST_NAME, MANIFEST_NAME + ".tmp",
+                      "chunk_[0-9][0-9][0-9][0-9][0-9].*.csv", "chunk_[0-9][0-9][0-9][0-9][0-9].*.csv.tmp",
+                      "merge_*_[0-9]*_[0-9][0-9][0-9][0-9][0-9].csv"]
+
+def remove_chunk_files(chunk_dir, keep):
+    """Delete the files this run created in chunk_dir, then the directory itself if it is empty.
+
+    Anything else in chunk_dir, and the paths in keep (the final outputs), is left alone.
+    """
+    keep = {p.resolve() for p in keep}
+    for pattern in CHUNK_DIR_PATTERNS:
+        for path in chunk_dir.glob(pattern):
+            if path.is_file() and path.resolve() not in keep:
+                path.unlink()
+    try:
+        chunk_dir.rmdir()
+    except OSError:
+        pass
+
+def atomic_write_json(path, data):
+    """Write JSON to path via a temp file + rename so readers never see a partial file."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def fsync_path(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def run_config(args, dates, performance_multiplier):
+    """Settings that must match for a checkpoint to be resumable."""
+    return {
+        "roster_sha256": file_sha256(args.roster),
+        "seed": args.seed,
+        "trials": args.trials,
+        "dates": [d.isoformat() for d in sorted(dates)],
+        "performance_multiplier": performance_multiplier,
+        "chunk_size": args.chunk_size,
+        "outputs": sorted(chunk_outputs(args)),
+        "order": args.order,
+        "ar1_phi": args.ar1_phi,
+    }
+
+def load_manifest(chunk_dir, config):
+    """Load an existing manifest if it was written for the same run configuration."""
+    path = chunk_dir / MANIFEST_NAME
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("config") != config:
+        print(f"Error: checkpoint in {chunk_dir} was written with different settings; "
+              f"rerun without --resume to start over.", file=sys.stderr)
+        sys.exit(1)
+    return manifest
+
+INDEX_GROUP_COLS = [OUT_FIELDS.index(c) for c in ("firstName","lastName","teamName","date","metric")]
 
-    # Trend over time: drift_per_day * day_index, plus trial noise
-    trend = spec["drift_per_day"] * day_index
-    v = random.gauss(center + base_offset + trend, jitter_sd)
-    return clamp(v, spec["min"], spec["max"])
+def _merge_csv_files(paths, date_col, out_path):
+    with ExitStack() as stack, open(out_path, "w", newline="", encoding="utf-8") as f:
+        readers = [csv.reader(stack.enter_context(open(p, newline="", encoding="utf-8"))) for p in paths]
+        csv.writer(f).writerows(heapq.merge(*readers, key=itemgetter(date_col)))
+
+def assemble_athlete_major(chunk_dir, num_chunks, outputs):
+    """Concatenate chunk parts into the final files.
+
+    The raw file is assembled first so the index parts can be rebased onto each chunk's
+    final byte offset.
+    """
+    chunk_starts = []
+    for part, (out_path, fields) in outputs.items():
+        tmp_out = out_path.with_name(out_path.name + ".tmp")
+        if part == "index":
+            with open(tmp_out, "wb") as f:
+                IndexWriter(f, None).writeheader()
+                for index, chunk_start in enumerate(chunk_starts):
+                    with open(chunk_dir / chunk_filename(index, part), "rb") as chunk:
+                        rebase_index(chunk, f, chunk_start)
+        else:
+            with open(tmp_out, "wb") as f:
+                stream = ByteCountingWriter(f)
+                csv.DictWriter(stream, fieldnames=fields).writeheader()
+                for index in range(num_chunks):
+                    if part == "raw":
+                        chunk_starts.append(stream.offset)
+                    with open(chunk_dir / chunk_filename(index, part), "rb") as chunk:
+                        shutil.copyfileobj(chunk, f)
+                    stream.offset = f.tell()
+        os.replace(tmp_out, out_path)
+
+def assemble_date_major(chunk_dir, num_chunks, outputs):
+    """K-way merge date-sorted chunk parts into the final files.
+
+    Chunks are sorted runs in roster order and heapq.merge is stable, so every date lists
+    athletes in roster order. The index, if requested, is rebuilt from the merged rows.
+    """
+    for part, (out_path, fields) in outputs.items():
+        if part == "index":
+            continue
+        date_col = fields.index("date")
+        paths = [chunk_dir / chunk_filename(index, part) for index in range(num_chunks)]
+        paths = reduce_merge_fanin(paths, lambda group, out: _merge_csv_files(group, date_col, out),
+                                   chunk_dir, part, ".csv")
+
+        tmp_out = out_path.with_name(out_path.name + ".tmp")
+        index_out = None
+        if part == "raw" and "index" in outputs:
+            index_out = outputs["index"][0]
+        with ExitStack() as stack:
+            if part == "raw":
+                tmp_index = index_out.with_name(index_out.name + ".tmp") if index_out else None
+                w, index_writer = open_raw_writer(stack, tmp_out, tmp_index)
+            else:
+                w = csv.DictWriter(stack.enter_context(open(tmp_out, "w", newline="", encoding="utf-8")),
+                                   fieldnames=fields)
+                w.writeheader()
+                index_writer = None
+            readers = [csv.reader(stack.enter_context(open(p, newline="", encoding="utf-8"))) for p in paths]
+
+            group = start = None
+            for row in heapq.merge(*readers, key=itemgetter(date_col)):
+                if index_writer is not None:
+                    # Each session's trials stay contiguous through the merge
+                    row_group = [row[c] for c in INDEX_GROUP_COLS]
+                    if row_group != group:
+                        if group is not None:
+                            index_writer.add(*group, start)
+                        group = row_group
+                        start = index_writer.mark()
+                w.writer.writerow(row)
+            if group is not None:
+                index_writer.add(*group, start)
+        os.replace(tmp_out, out_path)
+        if index_out:
+            os.replace(tmp_index, index_out)
+
+def chunk_outputs(args):
+    """Map each requested CSV output to (final path, header fields)."""
+    outputs = {}
+    if args.out:
+        outputs["raw"] = (Path(args.out), OUT_FIELDS)
+    if args.index:
+        outputs["index"] = (Path(index_path_for(args.out)), BLOCK_FIELDS)
+    if args.summary_out:
+        outputs["summary"] = (Path(args.summary_out), SUMMARY_FIELDS)
+    return outputs
+
+def generate_chunked(args, roster, dates, base, static_vals, performance_multiplier):
+    """Generate the output in numbered athlete-range chunks, checkpointing after each one.
+
+    Every chunk reseeds the RNG from (seed, chunk number), so a resumed run produces
+    byte-identical output to an uninterrupted one.
+    """
+    outputs = chunk_outputs(args)
+    first_path = next(iter(outputs.values()))[0]
+    chunk_dir = Path(args.chunk_dir) if args.chunk_dir else first_path.with_name(first_path.name + ".chunks")
+    chunk_dir.mkdir(parents=True, exist_ok=True)
+
+    config = run_config(args, dates, performance_multiplier)
+    manifest = load_manifest(chunk_dir, config) if args.resume else None
+    if manifest is None:
+        if args.resume:
+            print(f"No checkpoint found in {chunk_dir}; starting from the beginning.", file=sys.stderr)
+        manifest = {"version": MANIFEST_VERSION, "config": config, "chunks": {}}
+        atomic_write_json(chunk_dir / MANIFEST_NAME, manifest)
+
+    num_chunks = (len(roster) + args.chunk_size - 1) // args.chunk_size
+    for index in range(num_chunks):
+        # Date-major runs rebuild the index while merging, so chunks don't need index parts
+        names = {part: chunk_filename(index, part) for part in outputs
+                 if not (part == "index" and args.order == "date")}
+        done = manifest["chunks"].get(str(index))
+        if done is not None and all((chunk_dir / name).exists() for name in names.values()):
+            continue
+
+        start = index * args.chunk_size
+        end = min(start + args.chunk_size, len(roster))
+        seed = chunk_seed(args.seed, index)
+        random.seed(seed)
+
+        tmp = {part: chunk_dir / (name + ".tmp") for part, name in names.items()}
+        with ExitStack() as stack:
+            w = sw = index_writer = None
+            if "raw" in tmp:
+                # Chunk parts have no header; index offsets are relative to the chunk start
+                w, index_writer = open_raw_writer(stack, tmp["raw"], tmp.get("index"), header=False)
+            if "summary" in tmp:
+                sw = csv.DictWriter(stack.enter_context(open(tmp["summary"], "w", newline="", encoding="utf-8")),
+                                    fieldnames=SUMMARY_FIELDS)
+            rows = write_measurements(roster[start:end], dates, base, static_vals,
+                                      args.trials, performance_multiplier, args.order, args.memory_mb,
+                                      ar1_phi=args.ar1_phi, w=w, sw=sw, index=index_writer)
+        for part, name in names.items():
+            fsync_path(tmp[part])
+            os.replace(tmp[part], chunk_dir / name)
+
+        manifest["chunks"][str(index)] = {"files": names, "athletes": [start, end], "seed": seed, "rows": rows}
+        atomic_write_json(chunk_dir / MANIFEST_NAME, manifest)
+        print(f"Chunk {index + 1}/{num_chunks}: athletes {start}-{end - 1}, {rows} rows", file=sys.stderr)
+
+    # Assemble the final files from the completed chunks
+    if args.order == "date":
+        assemble_date_major(chunk_dir, num_chunks, outputs)
+    else:
+        assemble_athlete_major(chunk_dir, num_chunks, outputs)
+    remove_chunk_files(chunk_dir, [path for path, _ in outputs.values()])
 
 def main():
     args = parse_args()
@@ -419,68 +1052,43 @@ def main():
     # Stable athlete-specific baselines
     base = athlete_baseline_offsets(roster)
 
-    # Pre-compute static metric values (HEIGHT, WEIGHT, etc.) once per athlete
+    # Draw static metric profiles (HEIGHT, WEIGHT, etc.) once per athlete
     static_vals = compute_static_values(roster, performance_multiplier)
 
-    out_fields = ["firstName","lastName","gender","teamName","date","age","metric","trial","value","units","flyInDistance","notes"]
-    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
-    with open(args.out, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=out_fields)
-        w.writeheader()
-
-        for a in roster:
-            key = (a.get("firstName","").strip(), a.get("lastName","").strip(), a.get("teamName","").strip())
-            per_metric_offset = base[key]
-            gender = a.get("gender","")
-            team = a.get("teamName","")
-            birthDate = a.get("birthDate","")
-            sport = a.get("sports", "").strip()
-            position = a.get("position", "").strip()
-
-            if not sport:
-                print(f"Warning: No sport specified for {key[0]} {key[1]}. Skipping.", file=sys.stderr)
-                continue
-
-            metrics = get_sport_metrics(sport)
-
-            for di, d in enumerate(sorted(dates)):
-                age = age_on(birthDate, d)
-
-                # Sort metrics so static (anthropometric) come first
-                sorted_metrics = sorted(metrics.items(), key=lambda x: (not x[1].get("static", False), x[0]))
-                for metric, spec in sorted_metrics:
-                    is_static = spec.get("static", False)
-                    # Static metrics (HEIGHT, WEIGHT, etc.) only need 1 trial
-                    num_trials = 1 if is_static else args.trials
-                    for trial in range(num_trials):
-                        if is_static:
-                            # Use pre-computed static value (consistent across all dates)
-                            val = static_vals[key][metric]
-                        else:
-                            # Generate dynamic value with jitter
-                            jitter_sd = spec["sd"] * 0.5
-                            val = gen_value(spec, per_metric_offset[metric], di, jitter_sd, age, gender, metric,
-                                           performance_multiplier, sport, position)
-
-                        row = {
-                            "firstName": key[0],
-                            "lastName": key[1],
-                            "gender": gender,
-                            "teamName": team,
-                            "date": d.isoformat(),
-                            "age": age,
-                            "metric": metric,
-                            "trial": trial + 1,
-                            "value": round(val, 3),
-                            "units": spec["units"],
-                            "flyInDistance": spec["flyInDistance"],
-                            "notes": "Auto-generated",
-                        }
-                        w.writerow(row)
-
-    print(f"Wrote measurements: {args.out}")
+    for path in (args.out, args.summary_out):
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+    if args.chunk_size:
+        generate_chunked(args, roster, dates, base, static_vals, performance_multiplier)
+    else:
+        db = athlete_ids = None
+        if args.sqlite:
+            Path(args.sqlite).parent.mkdir(parents=True, exist_ok=True)
+            db = SqliteSink(args.sqlite)
+            athlete_ids = db.add_athletes(roster)
+
+        with ExitStack() as stack:
+            w = sw = index = None
+            if args.out:
+                w, index = open_raw_writer(stack, args.out, index_path_for(args.out) if args.index else None)
+            if args.summary_out:
+                sw = csv.DictWriter(stack.enter_context(open(args.summary_out, "w", newline="", encoding="utf-8")),
+                                    fieldnames=SUMMARY_FIELDS)
+                sw.writeheader()
+            write_measurements(roster, dates, base, static_vals, args.trials, performance_multiplier,
+                               args.order, args.memory_mb, ar1_phi=args.ar1_phi,
+                               w=w, sw=sw, db=db, athlete_ids=athlete_ids, index=index)
+
+        if db is not None:
+            print(db.close())
+
+    if args.out:
+        print(f"Wrote measurements: {args.out}")
+    if args.index:
+        print(f"Wrote index: {index_path_for(args.out)}")
+    if args.summary_out:
+        print(f"Wrote summary: {args.summary_out}")
     print(f"Dates used: {', '.join([d.isoformat() for d in dates])}")
 
 if __name__ == "__main__":
     main()
-
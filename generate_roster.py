@@ -3,6 +3,8 @@ import argparse, csv, random
 from datetime import date, timedelta
 from pathlib import Path
 
+from sqlite_sink import SqliteSink
+
 HEADERS = [
     "firstName","lastName","birthDate","birthYear","graduationYear","gender",
     "emails","phoneNumbers","sports","position","height","weight","school","teamName"
@@ -112,7 +114,7 @@ EMAIL_DOMAINS = ["email.com","school.edu","mail.com","inbox.com"]
 
 def parse_args():
     p = argparse.ArgumentParser(description="Generate a roster CSV.")
-    p.add_argument("--out", required=True, help="Output CSV path")
+    p.add_argument("--out", help="Output CSV path")
     p.add_argument("--num", type=int, required=True, help="Number of players")
     p.add_argument("--gender", choices=["Male","Female","Not Specified"], help="Gender for all players")
     p.add_argument("--sport", default=None, help="Sport name (default: Soccer)")
@@ -124,7 +126,11 @@ def parse_args():
     p.add_argument("--exclude_last_names", nargs="*", help="Last names to exclude from generation")
     p.add_argument("--height_adjust", type=int, default=0, help="Height adjustment in inches (e.g., +2 for taller, -2 for shorter)")
     p.add_argument("--seed", type=int, default=42, help="Random seed")
-    return p.parse_args()
+    p.add_argument("--sqlite", help="Also bulk-load the roster into this SQLite database")
+    args = p.parse_args()
+    if not args.out and not args.sqlite:
+        p.error("at least one of --out or --sqlite is required")
+    return args
 
 def get_birth_years_for_age_group(age_group: str, current_year: int = 2025):
     """Return (min_birth_year, max_birth_year) for the given age group."""
@@ -252,9 +258,6 @@ def main():
         suffix = "B" if gender == "Male" else ("G" if gender == "Female" else "X")
         team = f"{sport} {cohort}{suffix} Squad"
 
-    out_path = Path(args.out)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-
     rows = []
     used_names = set()
     
@@ -303,12 +306,20 @@ def main():
             "teamName": team
         })
 
-    with out_path.open("w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=HEADERS)
-        w.writeheader()
-        w.writerows(rows)
+    if args.out:
+        out_path = Path(args.out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with out_path.open("w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=HEADERS)
+            w.writeheader()
+            w.writerows(rows)
+        print(f"Wrote roster: {out_path}")
 
-    print(f"Wrote roster: {out_path}")
+    if args.sqlite:
+        Path(args.sqlite).parent.mkdir(parents=True, exist_ok=True)
+        db = SqliteSink(args.sqlite)
+        db.add_athletes(rows)
+        print(db.close())
     print(f"Team: {team} | Players: {len(rows)} | Gender: {gender} | Sport: {sport}")
     age_group_msg = f" | Age group: {age_group}" if age_group else ""
     print(f"Birth years: {by_min}–{by_max}{age_group_msg}")
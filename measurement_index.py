@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Byte-offset index sidecar for measurement CSVs written by generate_measurements.py.
+
+The generator writes every athlete x date x metric session as a contiguous block of
+trial rows. With --index it also writes `<out>.idx`, mapping those sessions to byte
+ranges in the measurement file, so lookups can seek straight to the rows instead of
+scanning a multi-gigabyte file.
+
+The sidecar is two-level. Consecutive sessions of one athlete form a block (the whole
+athlete in athlete order, one athlete x date in date order). Each block starts with a
+line of BLOCK_FIELDS giving the athlete, the block's byte range in the CSV and the byte
+size of the session lines that follow. Each session line is SESSION_FIELDS, with the
+offset relative to the block. Readers stream the sidecar and seek past the session lines
+of athletes that don't match, so nothing is loaded up front.
+
+Usage:
+    ./measurement_index.py measurements.csv --first Ethan --last Smith
+    ./measurement_index.py measurements.csv --date 2025-03-15 --metric FLY10_TIME
+"""
+import argparse, csv, io, mmap, sys
+
+BLOCK_FIELDS = ["firstName","lastName","teamName","offset","length","sessionBytes"]
+SESSION_FIELDS = ["date","metric","offset","length"]
+INDEX_SUFFIX = ".idx"
+
+def index_path_for(csv_path):
+    return str(csv_path) + INDEX_SUFFIX
+
+def _csv_line(values):
+    buf = io.StringIO()
+    csv.writer(buf).writerow(values)
+    return buf.getvalue().encode("utf-8")
+
+def _parse_line(line):
+    return next(csv.reader([line.decode("utf-8")]))
+
+class ByteCountingWriter:
+    """Text-mode facade over a binary file that tracks the byte offset of everything written.
+
+    csv writers call write() once per row, so the offset between rows is exact.
+    """
+
+    def __init__(self, raw, offset=0):
+        self.raw = raw
+        self.offset = offset
+
+    def write(self, s):
+        b = s.encode("utf-8")
+        self.raw.write(b)
+        self.offset += len(b)
+        return len(s)
+
+class IndexWriter:
+    """Records the byte range of each session written through a ByteCountingWriter.
+
+    f must be a binary file. Sessions are buffered until the athlete changes, then
+    written as one block; call finish() after the last session.
+    """
+
+    def __init__(self, f, stream):
+        self.f = f
+        self.stream = stream
+        self.athlete = None
+        self.block_start = self.block_end = None
+        self.sessions = []
+
+    def writeheader(self):
+        self.f.write(_csv_line(BLOCK_FIELDS))
+
+    def mark(self):
+        return self.stream.offset
+
+    def add(self, first, last, team, date, metric, start):
+        athlete = (first, last, team)
+        if athlete != self.athlete or start != self.block_end:
+            self.finish()
+            self.athlete = athlete
+            self.block_start = start
+        self.sessions.append(_csv_line([date, metric, start - self.block_start, self.stream.offset - start]))
+        self.block_end = self.stream.offset
+
+    def finish(self):
+        if not self.sessions:
+            return
+        body = b"".join(self.sessions)
+        self.f.write(_csv_line([*self.athlete, self.block_start, self.block_end - self.block_start, len(body)]))
+        self.f.write(body)
+        self.sessions = []
+
+def rebase_index(src, dst, delta):
+    """Copy a header-less index part from src to dst (binary files), shifting its offsets by delta.
+
+    Used when concatenating chunk files; session offsets are block-relative, so only the
+    block lines change.
+    """
+    offset_col = BLOCK_FIELDS.index("offset")
+    while True:
+        line = src.readline()
+        if not line:
+            return
+        block = _parse_line(line)
+        block[offset_col] = int(block[offset_col]) + delta
+        dst.write(_csv_line(block))
+        dst.write(src.read(int(block[-1])))
+
+def _merge_ranges(ranges):
+    """Sort byte ranges and coalesce adjacent ones so each contiguous block is read once."""
+    merged = []
+    for start, length in sorted(ranges):
+        if merged and merged[-1][0] + merged[-1][1] == start:
+            merged[-1][1] += length
+        else:
+            merged.append([start, length])
+    return merged
+
+class MeasurementIndex:
+    """Memory-maps a measurement CSV and serves rows by athlete, date and/or metric via its index."""
+
+    def __init__(self, csv_path, index_path=None):
+        self.csv_path = csv_path
+        self.index_path = index_path or index_path_for(csv_path)
+        self._file = open(csv_path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        header_end = self._mm.find(b"\n") + 1
+        self.fields = next(csv.reader([self._mm[:header_end].decode("utf-8")]))
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def ranges(self, first=None, last=None, team=None, date=None, metric=None):
+        """Return merged (offset, length) byte ranges for sessions matching every given filter."""
+        athlete_filter = [(i, v) for i, v in enumerate((first, last, team)) if v is not None]
+        session_filter = [(i, v) for i, v in enumerate((date, metric)) if v is not None]
+        found = []
+        with open(self.index_path, "rb") as f:
+            f.readline()  # header
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                block = _parse_line(line)
+                offset, length, session_bytes = int(block[3]), int(block[4]), int(block[5])
+                if not all(block[i] == v for i, v in athlete_filter):
+                    f.seek(session_bytes, 1)
+                elif not session_filter:
+                    found.append((offset, length))
+                    f.seek(session_bytes, 1)
+                else:
+                    body = f.read(session_bytes).decode("utf-8")
+                    for s in csv.reader(io.StringIO(body, newline="")):
+                        if all(s[i] == v for i, v in session_filter):
+                            found.append((offset + int(s[2]), int(s[3])))
+        return _merge_ranges(found)
+
+    def rows(self, first=None, last=None, team=None, date=None, metric=None):
+        """Yield matching measurement rows as dicts, reading only the indexed byte ranges."""
+        for start, length in self.ranges(first, last, team, date, metric):
+            block = self._mm[start:start + length].decode("utf-8")
+            for values in csv.reader(io.StringIO(block, newline="")):
+                yield dict(zip(self.fields, values))
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Look up rows in a measurement CSV using its .idx sidecar.")
+    p.add_argument("csv", help="Measurement CSV written with --index")
+    p.add_argument("--index", help="Index path (default: <csv>.idx)")
+    p.add_argument("--first", help="Athlete first name")
+    p.add_argument("--last", help="Athlete last name")
+    p.add_argument("--team", help="Team name")
+    p.add_argument("--date", help="Test date YYYY-MM-DD")
+    p.add_argument("--metric", help="Metric name, e.g. FLY10_TIME")
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+    with MeasurementIndex(args.csv, args.index) as idx:
+        w = csv.DictWriter(sys.stdout, fieldnames=idx.fields)
+        w.writeheader()
+        for row in idx.rows(args.first, args.last, args.team, args.date, args.metric):
+            w.writerow(row)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Bulk-load sink for writing generated rosters and measurements straight into SQLite.
+
+Shared by generate_roster.py and generate_measurements.py. Rows are inserted with
+batched executemany() inside large transactions, with WAL journaling and relaxed
+fsync; secondary indexes are dropped before the load and rebuilt afterwards.
+"""
+import sqlite3
+import time
+
+BATCH_SIZE = 50_000          # rows per executemany() call
+TRANSACTION_ROWS = 1_000_000 # rows per committed transaction
+
+ATHLETE_COLUMNS = [
+    "firstName","lastName","birthDate","birthYear","graduationYear","gender",
+    "emails","phoneNumbers","sports","position","height","weight","school","teamName"
+]
+# Identify an athlete; kept as '' when blank so every roster row can be inserted and looked up
+ATHLETE_KEY_COLUMNS = ("firstName","lastName","teamName")
+MEASUREMENT_COLUMNS = ["athlete_id","date","age","metric","trial","value","units","flyInDistance","notes"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS athletes (
+    id INTEGER PRIMARY KEY,
+    firstName TEXT NOT NULL,
+    lastName TEXT NOT NULL,
+    birthDate TEXT,
+    birthYear INTEGER,
+    graduationYear INTEGER,
+    gender TEXT,
+    emails TEXT,
+    phoneNumbers TEXT,
+    sports TEXT,
+    position TEXT,
+    height INTEGER,
+    weight INTEGER,
+    school TEXT,
+    teamName TEXT NOT NULL,
+    UNIQUE (firstName, lastName, teamName)
+);
+CREATE TABLE IF NOT EXISTS measurements (
+    id INTEGER PRIMARY KEY,
+    athlete_id INTEGER NOT NULL REFERENCES athletes(id),
+    date TEXT NOT NULL,
+    age INTEGER,
+    metric TEXT NOT NULL,
+    trial INTEGER NOT NULL,
+    value REAL NOT NULL,
+    units TEXT,
+    flyInDistance INTEGER,
+    notes TEXT
+);
+"""
+
+# Built after the load so inserts don't pay for index maintenance
+INDEXES = {
+    "idx_measurements_athlete_date": "measurements (athlete_id, date)",
+    "idx_measurements_metric_date": "measurements (metric, date)",
+}
+
+def _null_if_blank(v):
+    return None if v == "" else v
+
+def _athlete_values(row):
+    values = []
+    for c in ATHLETE_COLUMNS:
+        v = str(row.get(c, "")).strip()
+        values.append(v if c in ATHLETE_KEY_COLUMNS else _null_if_blank(v))
+    return values
+
+class SqliteSink:
+    """Buffered bulk inserter for the athletes and measurements tables."""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-262144")  # 256 MiB
+        self.conn.executescript(SCHEMA)
+        for name in INDEXES:
+            self.conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+        self.pending = []
+        self.in_txn_rows = 0
+        self.athletes_inserted = 0
+        self.measurements_inserted = 0
+        self.insert_seconds = 0.0
+        self.conn.execute("BEGIN")
+
+    def add_athletes(self, rows):
+        """Insert roster rows (dicts keyed by ATHLETE_COLUMNS) and return their integer IDs in order.
+
+        Athletes already present (same firstName, lastName, teamName) keep their existing ID,
+        so a roster loaded by generate_roster.py can be reused by generate_measurements.py.
+        """
+        start = time.perf_counter()
+        cols = ", ".join(ATHLETE_COLUMNS)
+        marks = ", ".join("?" for _ in ATHLETE_COLUMNS)
+        cur = self.conn.executemany(
+            f"INSERT OR IGNORE INTO athletes ({cols}) VALUES ({marks})",
+            (_athlete_values(r) for r in rows),
+        )
+        self.athletes_inserted += cur.rowcount
+
+        ids = {}
+        for athlete_id, first, last, team in self.conn.execute(
+                "SELECT id, firstName, lastName, teamName FROM athletes"):
+            ids[(first, last, team)] = athlete_id
+        self.insert_seconds += time.perf_counter() - start
+        return [ids[(str(r.get("firstName", "")).strip(), str(r.get("lastName", "")).strip(),
+                     str(r.get("teamName", "")).strip())] for r in rows]
+
+    def add_measurement(self, athlete_id, date, age, metric, trial, value, units, fly_in_distance, notes):
+        self.pending.append((athlete_id, date, _null_if_blank(age), metric, trial, value,
+                             units, _null_if_blank(fly_in_distance), notes))
+        if len(self.pending) >= BATCH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if not self.pending:
+            return
+        start = time.perf_counter()
+        cols = ", ".join(MEASUREMENT_COLUMNS)
+        marks = ", ".join("?" for _ in MEASUREMENT_COLUMNS)
+        self.conn.executemany(f"INSERT INTO measurements ({cols}) VALUES ({marks})", self.pending)
+        self.measurements_inserted += len(self.pending)
+        self.in_txn_rows += len(self.pending)
+        self.pending = []
+        if self.in_txn_rows >= TRANSACTION_ROWS:
+            self.conn.execute("COMMIT")
+            self.conn.execute("BEGIN")
+            self.in_txn_rows = 0
+        self.insert_seconds += time.perf_counter() - start
+
+    def close(self):
+        """Flush remaining rows, commit, build indexes and return a throughput summary line."""
+        self._flush()
+        start = time.perf_counter()
+        self.conn.execute("COMMIT")
+        self.insert_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for name, target in INDEXES.items():
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+        index_seconds = time.perf_counter() - start
+        self.conn.close()
+
+        rows = self.athletes_inserted + self.measurements_inserted
+        rate = rows / self.insert_seconds if self.insert_seconds > 0 else float("inf")
+        return (f"SQLite {self.path}: inserted {self.athletes_inserted} athletes, "
+                f"{self.measurements_inserted} measurements in {self.insert_seconds:.2f}s "
+                f"({rate:,.0f} rows/s); indexes built in {index_seconds:.2f}s")